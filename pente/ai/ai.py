@@ -1,3 +1,4 @@
+import itertools
 import random
 
 import numpy as np
@@ -46,13 +47,63 @@ _SCORES = {
 }
 
 
+# Every pattern has a stone other than at its center, so no pattern can match a play without a stone within this many
+# tiles along one of its lines
+_REACH = max(len(pattern) for pattern in _SCORES) - 1
+
+
+def _near_stones(board: Board, reach: int) -> np.ndarray:
+    """
+    :returns: A mask of the tiles which have a stone within `reach` tiles of them along some line
+    """
+    occupied = board.data != EMPTY
+    near = np.zeros_like(occupied)
+    for direction in itertools.product((-1, 0, 1), repeat=occupied.ndim):
+        if not any(direction):
+            continue
+        for distance in range(1, reach + 1):
+            # Mark each tile whose tile `distance` steps away in this direction is occupied
+            shifts = [step * distance for step in direction]
+            near_slices = tuple(slice(max(0, -shift), size - max(0, shift))
+                                for shift, size in zip(shifts, occupied.shape))
+            occupied_slices = tuple(slice(max(0, shift), size + min(0, shift))
+                                    for shift, size in zip(shifts, occupied.shape))
+            near[near_slices] |= occupied[occupied_slices]
+    return near
+
+
+# Whether a pattern matches a line depends only on the line's tiles and center, so the patterns matching each line
+# are remembered by those. Most lines are unchanged between suggestions, and many repeat within one.
+_MAX_CACHED_LINES = 1 << 16
+_line_matches: dict[tuple[bytes, int], tuple[int, ...]] = {}
+
+
+def _matching_patterns(line: Board.Line) -> tuple[int, ...]:
+    """
+    :returns: The index in _SCORES of each pattern which matches the line
+    """
+    key = (line.tile_bytes, line.center)
+    matches = _line_matches.get(key)
+    if matches is None:
+        if len(_line_matches) >= _MAX_CACHED_LINES:
+            _line_matches.clear()
+        matches = tuple(i for i, pattern in enumerate(_SCORES) if pattern.match_line(line))
+        _line_matches[key] = matches
+    return matches
+
+
 def _score_play(board: Board, center: tuple[int, ...]):
-    lines = board.get_lines(center)
+    counts = [0] * len(_SCORES)
+    for line in board.get_lines(center):
+        for i in _matching_patterns(line):
+            counts[i] += 1
+
+    # Scores are added once per matching line, by pattern and then by line, so that the total is rounded the same
+    # whichever lines were already cached
     result = 0
-    for pattern, score in _SCORES.items():
-        for line in lines:
-            if pattern.match_line(line):
-                result += score
+    for score, count in zip(_SCORES.values(), counts):
+        for _ in range(count):
+            result += score
     return result
 
 
@@ -63,18 +114,23 @@ def _score_play(board: Board, center: tuple[int, ...]):
 def best_move(gamestate: GameState, difficulty: float) -> tuple[int, ...]:
     board = gamestate.board.copy()
 
+    # Plays far from every stone can't match any pattern, so they score nothing without being matched
+    near = _near_stones(board, _REACH)
+
     best_play, best_score = (0,) * len(board.dimensions), float('-inf')
     for test_play in np.ndindex(board.dimensions):
         if board[test_play] != EMPTY:
             continue
 
-        board[test_play] = gamestate.next_player
-        test_score = _score_play(board, test_play)
+        if near[test_play]:
+            board[test_play] = gamestate.next_player
+            test_score = _score_play(board, test_play)
+            board[test_play] = EMPTY
+        else:
+            test_score = 0
         test_score += difficulty * random.random()
         if test_score > best_score:
             best_play = test_play
             best_score = test_score
 
-        board[test_play] = EMPTY
-
     return best_play
@@ -343,8 +343,8 @@ class Cli:
             return
 
         if win_reason == '.all':
-            for win_reason, wins in stats.get_all_wins(username).items():
-                self.__language.print_key("cli.show_stats.ok", reason=win_reason, wins=str(wins))
+            self.__language.print_keys(("cli.show_stats.ok", {"reason": win_reason, "wins": str(wins)})
+                                       for win_reason, wins in stats.get_all_wins(username).items())
         else:
             wins = stats.get_wins(username, win_reason)
             self.__language.print_key("cli.show_stats.ok", reason=win_reason, wins=str(wins))
@@ -2,17 +2,20 @@
 Stores stateful aspects of the program that aren't UI-specific
 """
 import json
+import os
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
 from enum import Enum, auto
+from functools import partial
 from json import JSONDecodeError
 from pathlib import Path
-from typing import Optional, Sequence
+from threading import Lock
+from typing import Callable, Optional, Sequence
 
 from yaml.scanner import ScannerError
 
 from pente.account import accounts, stats
-from pente.ai import ai
 from pente.data import data, load_gamestate
 from pente.data.Language import Language
 from pente.data.data import Data
@@ -21,6 +24,13 @@ from pente.game.Game import Game
 from pente.game.GameState import GameState
 from pente.core.PlayerOutput import PlayerOutput
 
+# orjson is an optional dependency which serialises JSON considerably faster, directly to bytes
+try:
+    from orjson import dumps as _json_dumps
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
 
 class _ResponseEnum(Enum):
     """
@@ -31,12 +41,19 @@ class _ResponseEnum(Enum):
     def __init_subclass__(cls, **kwargs):
         if 'OK' not in cls.__members__:
             raise ValueError("Response enum must have an OK element")
+        # Each response records whether it's OK when its enum is defined, rather than looking up OK to compare with
+        for response in cls:
+            response._is_ok = response is cls.OK
 
     def __bool__(self):
-        return self == self.__class__.OK
+        return self._is_ok
 
 
 class Core:
+    __slots__ = ("__language", "__data", "__pack_names", "__accounts", "should_autosave", "difficulty",
+                 "should_track_stats", "__game", "__game_pack_names", "__player_output", "__save_executor",
+                 "__last_save", "__pending_saves", "__pending_saves_lock", "__save_suffix")
+
     def __init__(self, language: Language):
         self.__language: Language = language
         self.__data: Optional[Data] = None
@@ -51,6 +68,18 @@ class Core:
         self.__game_pack_names: tuple[str, ...] = ()
         self.__player_output: Optional[PlayerOutput] = None
 
+        # Saves are written by a single background thread, in the order they were made, so that moves don't wait on
+        # the disk. The most recent write is kept so that loading can wait for it.
+        self.__save_executor = ThreadPoolExecutor(max_workers=1)
+        self.__last_save: Optional[Future] = None
+        # The latest contents of each save that is queued but not yet being written, the write that will write it, and
+        # whether a failure to write it should be reported, by path. A save made while an earlier one to the same path
+        # is still queued replaces its contents, so quick moves don't queue an autosave each.
+        self.__pending_saves: dict[str, tuple[dict, bytes, Future, bool]] = {}
+        self.__pending_saves_lock = Lock()
+        # The packs and accounts last saved, and their serialised form to follow a serialised gamestate
+        self.__save_suffix: tuple[Optional[tuple], bytes] = (None, b"}")
+
     @property
     def accounts(self):
         return tuple(self.__accounts)
@@ -64,7 +93,11 @@ class Core:
         return self.__game is not None
 
     def resolve_account_index(self, account_index: int) -> Optional[str]:
-        return None if account_index >= len(self.__accounts) else self.__accounts[account_index]
+        return self.__accounts[account_index] if self.__is_account_index(account_index) else None
+
+    def __is_account_index(self, account_index: int) -> bool:
+        # Negative indices would otherwise count back from the last account logged in
+        return 0 <= account_index < len(self.__accounts)
 
     class LoginResponse(_ResponseEnum):
         OK = auto()
@@ -88,10 +121,10 @@ class Core:
         return Core.LoginResponse.OK
 
     def logout(self, account_index: int) -> bool:
-        if account_index >= len(self.__accounts):
+        if not self.__is_account_index(account_index):
             return False
 
-        self.__accounts.pop(account_index)
+        del self.__accounts[account_index]
         return True
 
     def load_data(self, names: Sequence[str]) -> bool:
@@ -119,7 +152,6 @@ class Core:
 
         self.__player_output.send_victory(self.__game, 0, True)
         self.__game = None
-        self.__mode = None
         self.__player_output = None
 
     class LaunchGameResponse(_ResponseEnum):
@@ -156,48 +188,115 @@ class Core:
         ILLEGAL = auto()
 
     def ui_move(self, coords: tuple[int, ...]) -> MoveResponse:
-        if self.__game is None:
+        game = self.__game
+        if game is None:
             return Core.MoveResponse.NO_GAME
 
-        if not self.__game.can_place(coords):
+        # The autosave is of the gamestate before the move, but is only written if the move turns out to be legal. The
+        # move is checked by placing it, rather than checking restrictions once to decide and again to place.
+        autosave = game.gamestate.to_dict() if self.should_autosave else None
+        if not game.place(coords):
             return Core.MoveResponse.ILLEGAL
+        if autosave is not None:
+            # Nothing waits for autosaves, so failures to write them are reported when they happen
+            self.__submit_save("autosave", autosave, should_report=True)
 
-        if self.should_autosave:
-            self.save("autosave")
-
-        self.__move(coords)
-        return Core.MoveResponse.OK
-
-    def __move(self, coords: tuple[int, ...]):
-        self.__game.place(coords)
-
-        if self.__game.winner is not None:
+        if game.winner is not None:
             self.__end_game()
         else:
             self.__update_players()
+        return Core.MoveResponse.OK
 
     def save(self, name: Optional[str] = None) -> Optional[str]:
+        """
+        Save the current game, waiting until it's written
+        :param name: The name of the save; if None, name it by the current date and time
+        :returns: The path of the save, or None if there's no game
+        :raises OSError: If the save couldn't be written
+        """
         if self.__game is None:
             return None
 
         if name is None:
             name = datetime.now().strftime('%Y-%m-%dT%H-%M-%S.%f')
-        name = f"saves/{name}.json"
-        save = self.__game.gamestate.to_dict()
-        save["datapacks"] = self.__game_pack_names
-        save["accounts"] = self.__accounts
+        path, write = self.__submit_save(name, self.__game.gamestate.to_dict(), should_report=False)
+        # An explicit save is only reported as saved once it's been written
+        write.result()
+        return path
 
-        Path("saves").mkdir(parents=True, exist_ok=True)
+    def __submit_save(self, name: str, gamestate: dict, should_report: bool) -> tuple[str, Future]:
+        """
+        Queue a gamestate of the current game to be saved
+        :param name: The name of the save, without its directory or extension
+        :param gamestate: The gamestate as a dictionary
+        :param should_report: Whether to report a failure to write the save, rather than only raising it from the write
+        :returns: The path of the save, and the write that will write it
+        """
+        name = f"saves/{name}.json"
+        # The packs and accounts rarely change between saves, so their serialised form is reused until they do
+        suffix_key = (self.__game_pack_names, tuple(self.__accounts))
+        if self.__save_suffix[0] != suffix_key:
+            suffix = _json_dumps({"datapacks": self.__game_pack_names, "accounts": self.__accounts})
+            # Continue the serialised gamestate's object, in place of its opening brace
+            self.__save_suffix = (suffix_key, b"," + suffix[1:])
+
+        with self.__pending_saves_lock:
+            queued = self.__pending_saves.get(name)
+            # A queued write will write the new contents, and a later write is already being waited for if there is one
+            if queued is None:
+                write = self.__save_executor.submit(self.__write_pending_save, name)
+                self.__last_save = write
+            else:
+                write = queued[2]
+            self.__pending_saves[name] = (gamestate, self.__save_suffix[1], write, should_report)
+        return name, write
+
+    def __write_pending_save(self, name: str):
+        """
+        Write the latest contents of a queued save, and stop it being queued
+        :raises OSError: If the save couldn't be written
+        """
+        with self.__pending_saves_lock:
+            gamestate, suffix, _, should_report = self.__pending_saves.pop(name)
+        try:
+            Core.__write_save(name, gamestate, suffix)
+        except OSError:
+            if should_report:
+                self.__language.print_key("error.save_game.failed", file_name=name)
+                traceback.print_exc()
+            raise
+
+    @staticmethod
+    def __write_save(name: str, gamestate: dict, suffix: bytes):
+        """
+        :param name: The path of the save
+        :param gamestate: The gamestate as a dictionary
+        :param suffix: The rest of the save, serialised, to replace the closing brace of the serialised gamestate
+        """
         #######################################################
         # GROUP B SKILL: WRITING AND READING FROM FILES       #
         # Write the serialised gamestate to a file to save it #
         #######################################################
-        with open(name, 'w') as file:
-            file.write(json.dumps(save))
-
-        return name
+        # Write to a temporary file and then replace the save, so that the save is never seen half-written
+        temp_name = name + ".tmp"
+        try:
+            file = open(temp_name, 'wb')
+        except FileNotFoundError:
+            # The saves directory is only created once it's found to be missing, rather than checked every save
+            Path("saves").mkdir(parents=True, exist_ok=True)
+            file = open(temp_name, 'wb')
+        with file:
+            file.write(_json_dumps(gamestate)[:-1] + suffix)
+        os.replace(temp_name, name)
+
+    def __wait_for_saves(self):
+        """Wait until every save that has been made is written, or has failed to be"""
+        if self.__last_save is not None:
+            wait((self.__last_save,))
 
     def load_game(self, player_output: PlayerOutput, file_name: str) -> LaunchGameResponse:
+        # The file may be a save that hasn't been written yet, such as the autosave when undoing
+        self.__wait_for_saves()
         try:
             gamestate, dct = load_gamestate.load_gamestate(self.__language, file_name)
         except (ScannerError, JSONDecodeError, FileNotFoundError, PermissionError):
@@ -241,7 +340,18 @@ class Core:
         return Core.UndoResponse.OK
 
     def ai_suggestion(self) -> Optional[tuple[int, ...]]:
+        task = self.ai_suggestion_task()
+        return None if task is None else task()
+
+    def ai_suggestion_task(self) -> Optional[Callable[[], tuple[int, ...]]]:
+        """
+        Prepare to find an AI suggestion for the current gamestate, which may then be found on another thread
+        :returns: A function to find the suggestion, or None if the AI can't suggest a move
+        """
         if self.__game is None or self.__game_pack_names != ("pente",):
             return None
 
-        return ai.best_move(self.__game.gamestate, self.difficulty)
+        # The AI is only imported once a suggestion is first asked for, so that it doesn't slow starting up
+        from pente.ai import ai
+        # The AI is given a snapshot, so moves made while it's thinking don't change the gamestate under it
+        return partial(ai.best_move, self.__game.gamestate.copy(), self.difficulty)
@@ -1,14 +1,20 @@
 """
 Manages the loading of language files and the processing of output
 """
+import re
 import traceback
-from collections.abc import Callable, Collection
+from collections.abc import Callable, Collection, Iterable
+
+# Matches a parameter such as {pack} in a lang value, capturing its name
+_PARAMETER = re.compile(r"\{(\w+)}")
 
 
 class Language:
     def __init__(self, languages: Collection[str], print_func: Callable[[str], None]):
         self.__print_fun = print_func
-        self.__lang_dict = {}
+        # Each value is split into alternating literal text and parameter names, so that it needn't be searched for
+        # parameters every time it is resolved
+        self.__lang_dict: dict[str, tuple[str, ...]] = {}
         for name in languages:
             self.__load_file(name)
 
@@ -24,13 +30,17 @@ class Language:
         ######################################################
         try:
             with open("resources/lang/" + name + ".lang", 'r') as file:
-                lines = file.readlines()
+                text = file.read()
         except (FileNotFoundError, PermissionError):
             self.print_key("error.file_absent.lang", language=name)
             traceback.print_exc()
             return
 
-        for line in lines:
+        # Collect the file's keys separately, so that the language dictionary is updated in one go. Bad lines are
+        # warned about afterwards, so that the warning can use the file's own keys.
+        entries = {}
+        bad_lines = []
+        for line in text.splitlines():
             if line == "":
                 continue
 
@@ -47,21 +57,37 @@ class Language:
                 value += "\n"
 
             if sep == "":
-                self.print_key("warning.lang.bad_line", line=key)
+                bad_lines.append(key)
             else:
-                self.__lang_dict[key] = value
+                entries[key] = tuple(_PARAMETER.split(value))
+
+        self.__lang_dict.update(entries)
+        for line in bad_lines:
+            self.print_key("warning.lang.bad_line", line=line)
 
     def resolve_key(self, key: str, /, **kwargs: str) -> str:
-        if key in self.__lang_dict:
-            string = self.__lang_dict[key]
-            for param, value in kwargs.items():
-                string = string.replace(f"{{{param}}}", value)
-            return string
-        else:
+        tokens = self.__lang_dict.get(key)
+        if tokens is None:
             params = " ".join(f"{param}={value}" for param, value in kwargs.items())
             return f"{key} {params}\n"
+        # Most values have no parameters, so are resolved by the lookup alone
+        if len(tokens) == 1:
+            return tokens[0]
+        # Odd-indexed tokens are parameter names; parameters without a given value are left as they are
+        return "".join(token if i % 2 == 0 else kwargs.get(token, f"{{{token}}}") for i, token in enumerate(tokens))
 
     def print_key(self, key: str, /, **kwargs: str):
+        self.__print_fun(self.__format_key(key, kwargs))
+
+    def print_keys(self, keys: Iterable[tuple[str, dict[str, str]]]):
+        """
+        Print several keys with a single call to the print function, so that their output is written together
+        :param keys: The key to print and the parameters to resolve it with, for each key in order
+        """
+        self.__print_fun("".join(self.__format_key(key, kwargs) for key, kwargs in keys))
+
+    def __format_key(self, key: str, kwargs: dict[str, str]) -> str:
+        """Resolve a key to be printed, prefixing errors and warnings"""
         string = self.resolve_key(key, **kwargs)
 
         prefix, _, _ = key.partition(".")
@@ -70,4 +96,4 @@ class Language:
         elif prefix == "warning":
             string = self.resolve_key(".warning") + string
 
-        self.__print_fun(string)
+        return string
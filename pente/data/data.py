@@ -4,14 +4,16 @@ Functions for loading datapacks and constructing sets of rules
 
 from __future__ import annotations
 
+import hashlib
 import itertools
 import json
 from collections.abc import Collection, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional
+from functools import cache
+from typing import Optional, TYPE_CHECKING
 
 import jsonschema as jsonschema
-import networkx as nx
 import yaml
 
 from pente.data import deserialize
@@ -23,6 +25,21 @@ from pente.game.Score import Score
 from pente.game.rule.Restriction import Restriction
 from pente.game.rule.Rule import Rule
 
+if TYPE_CHECKING:
+    import networkx as nx
+
+# The maximum number of datapack files to read and validate concurrently
+_MAX_LOAD_WORKERS = 8
+# SHA-256 digests of each schema, and of each datapack file which has already passed validation by it during this run
+_validated_hashes: set[tuple[str, str]] = set()
+
+
+@cache
+def _networkx():
+    """networkx is slow to import, so it's only imported once packs are first loaded"""
+    import networkx
+    return networkx
+
 
 @dataclass
 class Data:
@@ -39,7 +56,7 @@ class Data:
             return Game.from_gamestate(gamestate, self.dimensions, self.scores, self.restrictions, self.rules)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DatapackHeader:
     name: str
     dependencies: list[str]
@@ -49,6 +66,15 @@ class DatapackHeader:
     def __getitem__(self, item):
         return self.dct[item]
 
+    # Pickle as a plain tuple, rather than the generic field-by-field state of a frozen dataclass
+    def __getstate__(self) -> tuple[str, list[str], list[str], dict]:
+        return self.name, self.dependencies, self.load_after, self.dct
+
+    def __setstate__(self, state: tuple[str, list[str], list[str], dict]):
+        # The dataclass is frozen, so fields must be set through object
+        for field_name, value in zip(("name", "dependencies", "load_after", "dct"), state):
+            object.__setattr__(self, field_name, value)
+
 
 def load_packs(names: Sequence[str], language: Language) -> Data:
     """
@@ -64,7 +90,7 @@ def load_packs(names: Sequence[str], language: Language) -> Data:
 
     pack_names = [header.name for header in load_order]
     # Name the result by the display names of each pack that was explicitly requested, in the order they were loaded
-    display_name = ", ".join(header.dct.get("display_name", header["name"])
+    display_name = ", ".join(header.dct.get("display_name", header.name)
                              for header in load_order if header.name in names)
 
     # Scores
@@ -187,10 +213,13 @@ def _get_load_order(names: Sequence[str], schema: dict, language: Language) -> l
     # Standard graph algorithms can be used to find packs whose dependencies and load_afters have all been loaded, and #
     ####################################################################################################################
     # to determine if there is a circular dependency
+    nx = _networkx()
     network = nx.DiGraph()
-    headers = {}
+    # The schema is the same for every pack, so its digest for the validation cache is only found once
+    schema_digest = hashlib.sha256(json.dumps(schema, sort_keys=True, default=str).encode()).hexdigest()
+    headers = _load_headers(names, schema, schema_digest, language)
     for name in names:
-        _register_pack_and_dependencies(network, headers, name, schema, language)
+        _register_pack_and_dependencies(network, headers, name, language)
 
     # Process load_afters
     for name1, name2 in itertools.permutations(network.nodes, 2):
@@ -215,21 +244,39 @@ def _get_load_order(names: Sequence[str], schema: dict, language: Language) -> l
     return result
 
 
-# Side effects: modify `network` and `headers` in place
-def _register_pack_and_dependencies(network: nx.DiGraph, headers: dict[str, DatapackHeader], name: str, schema: dict,
+def _load_headers(names: Sequence[str], schema: dict, schema_digest: str, language: Language
+                  ) -> dict[str, DatapackHeader]:
+    """
+    Load the headers of the given datapacks and of all their dependencies. Each generation of dependencies is read and
+    validated concurrently, since file access and validation of separate packs are independent.
+    :param names: The names of datapacks to load.
+    :param schema: The schema against which to validate datapacks.
+    :param schema_digest: The SHA-256 digest of the schema, identifying it in the validation cache.
+    :param language: The language in which to log.
+    :returns: A dictionary associating the name of each pack with its header.
+    """
+    headers = {}
+    to_load = list(dict.fromkeys(names))
+    with ThreadPoolExecutor(max_workers=_MAX_LOAD_WORKERS) as executor:
+        while to_load:
+            loaded = executor.map(lambda name: _load_header(name, schema, schema_digest, language), to_load)
+            headers.update(zip(to_load, loaded))
+            to_load = list(dict.fromkeys(dependency for name in to_load for dependency in headers[name].dependencies
+                                         if dependency not in headers))
+    return headers
+
+
+# Side effects: modify `network` in place
+def _register_pack_and_dependencies(network: nx.DiGraph, headers: dict[str, DatapackHeader], name: str,
                                     language: Language):
     """
-    Modify `network` to include a given datapack name, and `headers` to associate that name with a datapack header. Do
-    the same for all dependencies recursively.
+    Modify `network` to include a given datapack name. Do the same for all dependencies recursively.
+    :param headers: The headers of the pack and all of its dependencies, by name.
     """
-    if name in headers:
-        # Pack is already loaded, but its recorded dependencies may still need to be updated, because other packs may
-        # have been added
-        header = headers[name]
-    else:
-        header = _load_header(name, schema, language)
-        headers[name] = header
-        network.add_node(name)
+    # If the pack is already registered, its recorded dependencies may still need to be updated, because other packs
+    # may have been added
+    header = headers[name]
+    network.add_node(name)
 
     # Record dependencies on and from other already-loaded packs. Those with unloaded packs will be recorded when those
     # packs are loaded.
@@ -241,7 +288,7 @@ def _register_pack_and_dependencies(network: nx.DiGraph, headers: dict[str, Data
             network.add_edge(name, other_name)
 
     # Check circular dependency
-    cycles = list(nx.simple_cycles(network))
+    cycles = list(_networkx().simple_cycles(network))
     if cycles:
         language.print_key("error.datapack.circular.dependency", pack=str(cycles[0][0]))
         raise DataError("error.datapack.circular.dependency")
@@ -253,14 +300,15 @@ def _register_pack_and_dependencies(network: nx.DiGraph, headers: dict[str, Data
         # Packs may cause other packs to load recursively by dependencies. This function calls itself for each #
         # dependency of this pack. The base case is a pack with no dependencies.                               #
         ########################################################################################################
-        _register_pack_and_dependencies(network, headers, dependency, schema, language)
+        _register_pack_and_dependencies(network, headers, dependency, language)
 
 
-def _load_header(name: str, schema: dict, language: Language) -> DatapackHeader:
+def _load_header(name: str, schema: dict, schema_digest: str, language: Language) -> DatapackHeader:
     """
     Read a datapack file and return its contents as a datapack header
     :param name: The name of the pack to load. The file name is "{name}.json".
     :param schema: The schema against which to validate the datapack, as a dictionary.
+    :param schema_digest: The SHA-256 digest of the schema, identifying it in the validation cache.
     :param language: The language in which to log.
     :returns: The datapack header.
     """
@@ -271,8 +319,9 @@ def _load_header(name: str, schema: dict, language: Language) -> DatapackHeader:
     # Read the file containing the datapack to load #
     #################################################
     try:
-        with open(f"resources/datapack/{name}.json", 'r') as file:
-            dct = json.load(file)
+        with open(f"resources/datapack/{name}.json", 'rb') as file:
+            raw = file.read()
+        dct = json.loads(raw)
     except json.JSONDecodeError:
         language.print_key("error.datapack.invalid_json", pack=name)
         raise
@@ -281,14 +330,18 @@ def _load_header(name: str, schema: dict, language: Language) -> DatapackHeader:
         raise
 
     # Schema validation
-    try:
-        jsonschema.validate(dct, schema)
-    except jsonschema.SchemaError:
-        language.print_key("error.datapack.invalid_schema")
-        raise
-    except jsonschema.ValidationError:
-        language.print_key("error.datapack.invalid_by_schema")
-        raise
+    # Files whose exact contents have already been validated by the same schema needn't be validated again
+    digest = (schema_digest, hashlib.sha256(raw).hexdigest())
+    if digest not in _validated_hashes:
+        try:
+            jsonschema.validate(dct, schema)
+        except jsonschema.SchemaError:
+            language.print_key("error.datapack.invalid_schema")
+            raise
+        except jsonschema.ValidationError:
+            language.print_key("error.datapack.invalid_by_schema")
+            raise
+        _validated_hashes.add(digest)
 
     if dct["name"] != name:
         language.print_key("error.datapack.inconsistent_name", file=name, pack=dct["name"])
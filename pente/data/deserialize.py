@@ -24,6 +24,10 @@ class DataError(RuntimeError):
     pass
 
 
+# Patterns are immutable, so rules and restrictions with the same pattern string can share a single Pattern
+_patterns: dict[str, Pattern] = {}
+
+
 class _RulePriority(IntEnum):
     EARLIEST = 0
     EARLIER = 1
@@ -40,7 +44,7 @@ def score(dct: dict, header: DatapackHeader, language: Language) -> Score:
 
 def _condition(dct: dict, header: DatapackHeader, language: Language, scores: Collection[str]) -> Condition:
     if "minimum" not in dct and "maximum" not in dct:
-        language.print_key("error.datapack.no_min_or_max", pack=header["name"])
+        language.print_key("error.datapack.no_min_or_max", pack=header.name)
         raise DataError("error.datapack.no_min_or_max")
 
     return _score_condition(dct, header, language, scores) if dct["type"] == "score" \
@@ -49,7 +53,7 @@ def _condition(dct: dict, header: DatapackHeader, language: Language, scores: Co
 
 def _score_condition(dct: dict, header: DatapackHeader, language: Language, scores: Collection[str]) -> ScoreCondition:
     if dct["memo"] not in scores:
-        language.print_key("error.datapack.unregistered_score", pack=header["name"], name=dct["memo"])
+        language.print_key("error.datapack.unregistered_score", pack=header.name, name=dct["memo"])
         raise DataError("error.datapack.unregistered_score")
 
     return ScoreCondition(dct["player_index"], dct["memo"], dct.get("minimum", None), dct.get("maximum", None))
@@ -60,12 +64,18 @@ def _coords_condition(dct: dict, header: DatapackHeader, language: Language) ->
 
 
 def _pattern(string: str, header: DatapackHeader, language: Language) -> Pattern:
+    if string in _patterns:
+        return _patterns[string]
+
     try:
-        return Pattern(string)
+        pattern_ = Pattern(string)
     except ValueError:
-        language.print_key("error.datapack.invalid_pattern", pack=header["name"], pattern=string)
+        language.print_key("error.datapack.invalid_pattern", pack=header.name, pattern=string)
         raise DataError("error.datapack.invalid_pattern")
 
+    _patterns[string] = pattern_
+    return pattern_
+
 
 def _pattern_restriction(dct: dict, header: DatapackHeader, language: Language, scores: Collection[str]
                          ) -> PatternRestriction:
@@ -96,10 +106,10 @@ def restriction(dct: dict, header: DatapackHeader, language: Language, scores: C
 def _score_action(dct: dict, header: DatapackHeader, language: Language, scores: Collection[str], pattern_len: int
                   ) -> ScoreAction:
     if dct["memo"] not in scores:
-        language.print_key("error.datapack.unregistered_score", pack=header["name"], name=dct["memo"])
+        language.print_key("error.datapack.unregistered_score", pack=header.name, name=dct["memo"])
         raise DataError("error.datapack.unregistered_score")
 
-    if dct["player_index"] > pattern_len:
+    if dct["player_index"] >= pattern_len:
         language.print_key("error.datapack.index_out_of_pattern", pack=header.name)
         raise DataError("error.datapack.index_out_of_pattern")
 
@@ -109,7 +119,7 @@ def _score_action(dct: dict, header: DatapackHeader, language: Language, scores:
 
 
 def _board_action(dct: dict, header: DatapackHeader, language: Language, pattern_len: int) -> BoardAction:
-    if dct["location_index"] > pattern_len or dct["player_index"] > pattern_len:
+    if dct["location_index"] >= pattern_len or dct["player_index"] >= pattern_len:
         language.print_key("error.datapack.index_out_of_pattern", pack=header.name)
         raise DataError("error.datapack.index_out_of_pattern")
 
@@ -118,7 +128,8 @@ def _board_action(dct: dict, header: DatapackHeader, language: Language, pattern
 
 def rule(dct: dict, header: DatapackHeader, language: Language, scores: Collection[str]) -> tuple[_RulePriority, Rule]:
     pattern_ = _pattern(dct["pattern"], header, language)
-    pattern_len = len(dct["pattern"])
+    # The length of the pattern excludes the brackets marking its center
+    pattern_len = len(pattern_)
     multimatch_modes = {"one": Rule.Mode.ONE, "half": Rule.Mode.HALF, "all": Rule.Mode.ALL}
     multimatch_mode = multimatch_modes[dct.get("multimatch_mode", "half")]
     conditions = [
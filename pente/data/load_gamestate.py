@@ -3,14 +3,28 @@ Functions for loading saved games to produce gamestates
 """
 
 import json
+from typing import Optional
 
 import jsonschema
+import numpy as np
 import yaml
 
 from pente.data import Language
 from pente.game.Board import Board
 from pente.game.GameState import GameState
 
+# orjson is an optional dependency which parses JSON considerably faster. Its errors subclass json.JSONDecodeError.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+
+_SCHEMA_PATH = "resources/save_schema.yml"
+
+# The validator for saved games, built from the schema file the first time a game is loaded
+_validator: Optional[jsonschema.protocols.Validator] = None
+
 
 class LoadGameStateError(RuntimeError):
     pass
@@ -25,8 +39,8 @@ def load_gamestate(language: Language, file_name: str) -> tuple[GameState, dict]
     # Read the file containing the serialised gamestate to load #
     #############################################################
     try:
-        with open(f"saves/{file_name}.json", 'r') as file:
-            dct = json.loads(file.read())
+        with open(f"saves/{file_name}.json", 'rb') as file:
+            dct = _json_loads(file.read())
     except json.JSONDecodeError:
         language.print_key("error.load_game.invalid_json")
         raise
@@ -34,9 +48,8 @@ def load_gamestate(language: Language, file_name: str) -> tuple[GameState, dict]
         language.print_key("error.load_game.game_file_absent")
         raise
 
-    schema = _load_schema(language)
     try:
-        jsonschema.validate(dct, schema)
+        _get_validator(language).validate(dct)
     except jsonschema.SchemaError:
         language.print_key("error.load_game.invalid_schema")
         raise
@@ -64,8 +77,14 @@ def load_gamestate(language: Language, file_name: str) -> tuple[GameState, dict]
     memos = scores.keys()
     active_player = dct["active_player"]
 
+    try:
+        values = np.array(list(scores.values()), dtype=np.int64).reshape(len(scores), num_players)
+    except OverflowError:
+        language.print_key("error.load_game.invalid_scores")
+        raise LoadGameStateError("error.load_game.invalid_scores")
+
     gamestate = GameState(board, memos, num_players)
-    gamestate.scores = scores
+    gamestate.scores.array[:] = values
     gamestate.active_player = active_player
     return gamestate, dct
 
@@ -76,7 +95,7 @@ def _load_schema(language: Language) -> dict:
     # Read the file containing the schema for validating the saved gamestate #
     ##########################################################################
     try:
-        with open("resources/save_schema.yml", 'r') as schema_file:
+        with open(_SCHEMA_PATH, 'r') as schema_file:
             return yaml.safe_load(schema_file)
     except yaml.scanner.ScannerError:
         language.print_key("error.load_game.invalid_schema")
@@ -84,3 +103,17 @@ def _load_schema(language: Language) -> dict:
     except (FileNotFoundError, PermissionError):
         language.print_key("error.file_absent.save_schema")
         raise
+
+
+def _get_validator(language: Language) -> jsonschema.protocols.Validator:
+    """
+    Get a validator for saved games. Building a validator requires parsing and checking the schema, so the validator is
+    built on first use and then reused for the rest of the process.
+    """
+    global _validator
+    if _validator is None:
+        schema = _load_schema(language)
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        _validator = validator_class(schema)
+    return _validator
@@ -1,29 +1,112 @@
-import itertools
 from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Self
+from functools import cache
+from typing import Optional, Self
 
 import numpy as np
 
 # Empty space on the board
 EMPTY = -1
 
+# The directions of lines on a two-dimensional board, in the same order as they would be found in general
+_DIRECTIONS_2D = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
 
 class Board:
-    @dataclass
+    @dataclass(slots=True)
     class Line:
-        tiles: Sequence[int]
-        tile_indices: Sequence[tuple[int, ...]]
+        tiles: np.ndarray
         center: int
+        # The coordinates of the first tile on the line
+        start: tuple[int, ...]
+        # The direction in which the line travels in each dimension
+        direction: tuple[int, ...]
+
+        def segment_indices(self, start: int, length: int) -> "Board.SegmentIndices":
+            """
+            Get the coordinates of a run of tiles on the line, as a view that finds each tile's coordinates on access
+            :param start: The index in the line of the first tile
+            :param length: The number of tiles
+            """
+            first = tuple(ordinate + start * direction for ordinate, direction in zip(self.start, self.direction))
+            return Board.SegmentIndices(first, self.direction, length)
+
+        @property
+        def tile_bytes(self) -> bytes:
+            """
+            The tiles of the line as bytes, one byte per tile. Empty tiles are 0xFF and stones are the index of their
+            player, so any stone has the top bit of its byte clear.
+            """
+            # Tiles are int8, so EMPTY is already 0xFF as an unsigned byte
+            return self.tiles.tobytes()
+
+        @property
+        def packed(self) -> int:
+            """The tiles of the line as bytes (see tile_bytes) packed into an integer, with the first tile in the lowest
+            byte"""
+            return int.from_bytes(self.tile_bytes, 'little')
+
+    class SegmentIndices(Sequence):
+        """
+        The coordinates of each tile on a run of tiles along a line. Usually only a few of a match's locations are ever
+        looked at, so the coordinates of each tile are computed when it's accessed.
+        """
+        __slots__ = ("__first", "__direction", "__length")
+
+        def __init__(self, first: tuple[int, ...], direction: tuple[int, ...], length: int):
+            self.__first = first
+            self.__direction = direction
+            self.__length = length
+
+        def __len__(self) -> int:
+            return self.__length
+
+        def __getitem__(self, index: int) -> tuple[int, ...]:
+            if index < 0:
+                index += self.__length
+            if not 0 <= index < self.__length:
+                raise IndexError("Tile index out of range")
+            return tuple(ordinate + index * direction for ordinate, direction in zip(self.__first, self.__direction))
 
     def __init__(self, dimensions: tuple[int, ...]):
         # The board is full of emptiness
-        self.__data = np.full(dimensions, EMPTY, dtype='int8')
+        self.__set_data(np.full(dimensions, EMPTY, dtype='int8'))
+
+    def __set_data(self, array: np.ndarray):
+        """
+        Set the array underlying the board, and precompute what get_lines needs to know about its shape
+        :param array: The tiles of the board; converted to a contiguous int8 array if it isn't one already
+        """
+        # Each tile is one byte, which lines rely on to view the tiles as bytes
+        array = np.ascontiguousarray(array, dtype=np.int8)
+        self.__data = array
+        # The array is contiguous, so flattening it gives a view rather than a copy
+        self.__flat = array.reshape(-1)
+        self.__flat_strides = tuple(stride // array.itemsize for stride in array.strides)
+        # The number of dimensions is fixed, so the directions of lines through any center can be found in advance, and
+        # are shared between all boards with the same number of dimensions. The step along the flattened array in each
+        # direction depends on the shape of the board, so is found for this board
+        self.__directions = [
+            (directs, back_indices, forward_indices,
+             sum(direction * stride for direction, stride in zip(directs, self.__flat_strides)))
+            for directs, back_indices, forward_indices in Board.__get_directions(array.ndim)
+        ]
+        # Lines are views of the array, so they stay up to date as tiles are placed. The most recent center and the
+        # lines through it are kept, since the same lines are usually wanted again to check and then make a move.
+        self.__last_lines: tuple[Optional[tuple[int, ...]], list[Board.Line]] = (None, [])
 
     @property
     def dimensions(self):
         return self.__data.shape
 
+    @property
+    def data(self) -> np.ndarray:
+        """
+        The array underlying the board, for indexing without validation where coordinates are already known to be valid.
+        Writes should go through the board so that values are validated.
+        """
+        return self.__data
+
     def __getitem__(self, coords: tuple[int, ...]) -> int:
         if len(coords) != self.__data.ndim:
             raise ValueError("Must provide a number of coordinates equal to the number of dimensions of the board")
@@ -37,8 +120,8 @@ class Board:
         self.__data[coords] = value
 
     def copy(self):
-        result = Board(self.dimensions)
-        result.__data = self.__data.copy()
+        result = Board.__new__(Board)
+        result.__set_data(self.__data.copy())
         return result
 
     def enumerate(self):
@@ -49,15 +132,52 @@ class Board:
 
     @staticmethod
     def from_list(lst: list) -> Self:
-        array = np.array(lst)
-        # Don't allow ragged arrays
-        if array.dtype.kind == 'O':
-            raise ValueError
-
-        board = Board(array.shape)
-        board.__data = array
+        # Ragged arrays raise ValueError
+        try:
+            array = np.array(lst, dtype='int8')
+        except OverflowError as e:
+            raise ValueError from e
+        # Tiles are either stones, which are player indices, or empty
+        if array.size and array.min() < EMPTY:
+            raise ValueError("Tiles must not be less than EMPTY")
+
+        # The array is used as the board's data directly, rather than first filling a new board with emptiness
+        board = Board.__new__(Board)
+        board.__set_data(array)
         return board
 
+    @staticmethod
+    @cache
+    def __get_directions(ndim: int) -> list[tuple[tuple[int, ...], tuple[int, ...], tuple[int, ...]]]:
+        """
+        Get the directions in which lines can travel through a board with a given number of dimensions
+        :param ndim: The number of dimensions of the board
+        :returns: A list of tuples of the direction in each dimension, and the indices into the edge distances (see
+        get_lines) of the distances to the edges behind and ahead of the center, for each dimension in which the line
+        travels
+        """
+        if ndim == 2:
+            # Almost every board is two-dimensional, so its directions are known without extracting them
+            all_directs = _DIRECTIONS_2D
+        else:
+            # The direction in which each line travels in each dimension
+            # directs_num // 3**i % 3 extracts the ith digit of directs_num in ternary
+            all_directs = (tuple(directs_num // 3 ** i % 3 - 1 for i in range(ndim))
+                           for directs_num in range(3 ** ndim))
+
+        result = []
+        for directs in all_directs:
+            # No line travels through 0 dimensions
+            if all(direction == 0 for direction in directs):
+                continue
+
+            # Travelling forwards in a dimension, the edge behind is the start of the board in that dimension
+            back_indices = tuple(i if direction == 1 else ndim + i for i, direction in enumerate(directs) if direction)
+            forward_indices = tuple(ndim + i if direction == 1 else i for i, direction in enumerate(directs)
+                                    if direction)
+            result.append((directs, back_indices, forward_indices))
+        return result
+
     #################################################################################################################
     # GROUP A SKILL: COMPLEX USER-DEFINED ALGORITHMS                                                                #
     # Used to get lines through the tile on which the active player just moved, in order to match rules along these #
@@ -67,95 +187,58 @@ class Board:
         """
         Get all lines, orthogonal or diagonal in any number of dimensions, through a given center on a given array
         :param center: The coordinates of the center
-        :returns: A list of tuples of the index of the center in each line, and the line itself
+        :returns: A list of tuples of the index of the center in each line, and the line itself. The list may be shared
+        between calls with the same center, so must not be modified.
         """
+        last_center, last_lines = self.__last_lines
+        # The game reuses tuples of coordinates, so the same center is usually the same object
+        if center is last_center or center == last_center:
+            return last_lines
+
         darray = self.__data
         if len(center) != darray.ndim:
             raise ValueError("Must provide a number of coordinates equal to the number of dimensions of the board")
 
-        # Create an array of indexes so we can tell where the returned tiles came from
-        # The 0th dimension ranges over dimensions of the board
-        iarray = np.indices(darray.shape)
+        ###############################################################################################################
+        # GROUP A SKILL: ADVANCED MATRIX OPERATIONS                                                                   #
+        # The board is viewed as a flattened array. Stepping one tile along a line in any direction is stepping by a  #
+        # fixed stride in the flattened array, found from the strides of the board in each dimension, so every line  #
+        # is a single strided slice                                                                                   #
+        ###############################################################################################################
+        flat = self.__flat
+        # The position of the center in the flattened array
+        center_offset = sum(ordinate * stride for ordinate, stride in zip(center, self.__flat_strides))
 
         result = []
 
-        for directs_num in range(3 ** len(center)):
-            # The direction in which this line travels in each dimension
-            # directs_num // 3**i % 3 extracts the ith digit of directs_num in ternary
-            directs = tuple(directs_num // 3 ** i % 3 - 1 for i in range(len(center)))
-            # No line travels through 0 dimensions
-            if all(direction == 0 for direction in directs):
-                continue
-
-            # Transform the array so that the line travels forward in all dimensions in which it travels
-            # We perform operations both on darray and iarray, so we get both data and indices
-            # We can't do just iarray because then changes in the board won't be reflected in the returned lines
-            # Start with a slice(None) to skip the 0th dimension of iarray
-            transform_indices = [slice(None)]
-            for ordinate, direction in zip(center, directs):
-                if direction == -1:
-                    transform_indices.append(slice(None, None, -1))
-                else:
-                    transform_indices.append(slice(None))
-            transformed_iarrray = iarray[tuple(transform_indices)]
-            transformed_darray = darray[tuple(transform_indices[1:])]
-
-            # Transform centre coordinates so that they are coordinates into the transformed array
-            transformed_centre = tuple(
-                length-1 - ordinate if direction == -1 else ordinate
-                for length, ordinate, direction in zip(darray.shape, center, directs)
-            )
-
-            # end_distances are the distances from the center to the end of the transformed array in each dimension
-            end_distances = [length-1 - ordinate for length, ordinate in zip(darray.shape, transformed_centre)]
-
-            # The position of the center in the line is the minimum ordinate for a dimension in which the line travels
-            min_ordinate = min(itertools.compress(transformed_centre, [direction != 0 for direction in directs]))
-            min_end_distance = min(itertools.compress(end_distances, [direction != 0 for direction in directs]))
-
-            # Crop the array so that the core diagonal passes through the desired center
-            # To achieve this, the center must have the same distance from the start in every dimension
-            # It must also have the same distance from the end so that the array is the same length in every dimension
-            # We also crop out the dimensions in which the line doesn't travel at this stage
-            crop_indices = [slice(None)]
-            for ordinate, end_distance, direction in zip(transformed_centre, end_distances, directs):
-                if direction == 0:
-                    # In this dimension, we only want the index that contains the center
-                    crop_indices.append(ordinate)
-                else:
-                    # Crop so that the centre lies on the core diagonal
-                    # The distance from the start to the centre in each dimension must be the same
-                    # ie each ordinate of the center within the cropped array is the same as min(transformed_centre)
-                    start_index = ordinate - min_ordinate
-
-                    # Crop so that the distance from the center to the end in each dimension is the same
-                    # `or None` ensures that we cut to the end, rather than the start, if the returned value is 0
-                    end_index = -(end_distance - min_end_distance) or None
-
-                    crop_indices.append(slice(start_index, end_index))
-
-            cropped_iarray = transformed_iarrray[tuple(crop_indices)]
-            cropped_darray = transformed_darray[tuple(crop_indices[1:])]
-
-            #########################################################################################################
-            # GROUP A SKILL: ADVANCED MATRIX OPERATIONS                                                             #
-            # A generalisation of the Einstein summation, a complex matrix operation, is used to get core diagonals #
-            # once the array has been appropriately transformed                                                     #
-            #########################################################################################################
-
-            # Take the diagonal from iarray for each dimension, and combine into a tuple
-            # np.einsum can get a diagonal in an arbitrary number of dimensions
-            tile_indices = tuple(
-                np.einsum(f'{"i"*(cropped_iarray.ndim-1)}->i', dimension)
-                for dimension in cropped_iarray
-            )
-            tiles = np.einsum(f'{"i"*cropped_darray.ndim}->i', cropped_darray)
+        # The distances from the center to the start of the board in each dimension, followed by the distances to the
+        # end of the board in each dimension
+        edge_distances = (*center, *(length-1 - ordinate for length, ordinate in zip(darray.shape, center)))
+
+        for directs, back_indices, forward_indices, step in self.__directions:
+            # The line starts when it reaches the edge of the board in any dimension in which it travels, so the
+            # position of the center in the line is the least distance to an edge behind it
+            min_ordinate = min(map(edge_distances.__getitem__, back_indices))
+            # Likewise, the line ends when it reaches the edge ahead of it in any of those dimensions
+            min_end_distance = min(map(edge_distances.__getitem__, forward_indices))
+
+            # Compute the tiles on the line arithmetically from its start, rather than cropping an array of indices
+            line_start = tuple(ordinate - min_ordinate * direction for ordinate, direction in zip(center, directs))
+            length = min_ordinate + min_end_distance + 1
+
+            if length == 1:
+                # A line along a dimension of size 1 may have a step of 0, which can't be sliced by
+                tiles = flat[center_offset:center_offset + 1]
+            else:
+                start = center_offset - min_ordinate * step
+                # A negative stop would count from the end of the array, rather than stopping before the start
+                stop = start + length * step
+                tiles = flat[start : stop if stop >= 0 else None : step]
 
             # Writing to tiles would alter the board
             tiles.setflags(write=False)
 
-            # Convert tile_indices from a tuple of arrays to an array of tuples, since the latter is more useful
-            # elsewhere in the program
-            result.append(Board.Line(tiles, list(zip(*tile_indices)), min_ordinate))
+            result.append(Board.Line(tiles, min_ordinate, line_start, directs))
 
+        self.__last_lines = (center if isinstance(center, tuple) else tuple(center), result)
         return result
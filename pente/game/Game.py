@@ -1,6 +1,9 @@
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
+from functools import partial
 from typing import Optional, Self
 
+import numpy as np
+
 from pente.game.Board import Board, EMPTY
 from pente.game.GameState import GameState
 from pente.game.Score import Score
@@ -15,9 +18,18 @@ class Game:
     def __init__(self, dimensions: tuple[int, ...], scores: Sequence[Score], restrictions: Sequence[Restriction],
                  rules: Sequence[Rule]):
         self.__gamestate = GameState(Board(dimensions), [score.name for score in scores], NUM_PLAYERS)
-        self.__scores = scores
+        # The display name and memo of each score that is displayed
+        self.__displayed_scores = tuple((score.display_name, score.name) for score in scores
+                                        if score.display_name is not None)
         self.__restrictions = restrictions
         self.__rules = rules
+        # The scores which can win the game, in the order in which they're checked, and their thresholds
+        self.__win_memos = [score.name for score in scores if score.win_threshold is not None]
+        self.__win_thresholds = np.array([score.win_threshold for score in scores if score.win_threshold is not None])
+        self.__find_win_rows()
+        self.__is_on_board = Game.__bounds_checker(dimensions)
+        # Each distinct tuple of coordinates that has been checked, mapped to itself
+        self.__coords: dict[tuple[int, ...], tuple[int, ...]] = {}
         self.winner = None
         self.win_reason = None
 
@@ -26,8 +38,35 @@ class Game:
                        restrictions: Sequence[Restriction], rules: Sequence[Rule]) -> Self:
         result = cls(dimensions, scores, restrictions, rules)
         result.__gamestate = gamestate
+        # A loaded gamestate may hold its scores in a different order, and its board may have a different shape
+        result.__find_win_rows()
+        result.__is_on_board = Game.__bounds_checker(gamestate.board.dimensions)
         return result
 
+    def __find_win_rows(self):
+        """Find the rows of the gamestate's score array holding the scores which can win the game"""
+        self.__win_rows = [self.__gamestate.scores.row(memo) for memo in self.__win_memos]
+
+    @staticmethod
+    def __bounds_checker(dimensions: tuple[int, ...]) -> Callable[[tuple[int, ...]], bool]:
+        """
+        Get a function to check whether coordinates have the right number of dimensions and are within the bounds of
+        the board. Boards are almost always two-dimensional, so that case is checked without looping.
+        :param dimensions: The dimensions of the board
+        """
+        if len(dimensions) == 2:
+            height, width = dimensions
+            return lambda coords: len(coords) == 2 and 0 <= coords[0] < height and 0 <= coords[1] < width
+
+        def is_on_board(coords: tuple[int, ...]) -> bool:
+            if len(coords) != len(dimensions):
+                return False
+            for ordinate, dimension in zip(coords, dimensions):
+                if ordinate < 0 or ordinate >= dimension:
+                    return False
+            return True
+        return is_on_board
+
     @property
     def gamestate(self) -> GameState:
         return self.__gamestate
@@ -36,12 +75,12 @@ class Game:
     def next_player(self) -> int:
         return self.gamestate.next_player
 
-    def get_displayable_scores(self) -> list[tuple[str, list[int]]]:
+    def get_displayable_scores(self) -> list[tuple[str, Sequence[int]]]:
         """
         :returns: A list of tuples of (display name, list of value of the score for each player) for each score
         """
-        return [(score.display_name, self.__gamestate.scores[score.name])
-                for score in self.__scores if score.display_name is not None]
+        scores = self.__gamestate.scores
+        return [(display_name, scores[memo]) for display_name, memo in self.__displayed_scores]
 
     def can_place(self, coords: tuple[int, ...], player: Optional[int] = None) -> bool:
         """
@@ -52,44 +91,80 @@ class Game:
         :param coords: The coordinates at which to consider placing
         :param player: The color of the tile to consider placing
         """
-        # Save the previous active player so that checking can_place doesn't affect the active player
-        saved_active_player = self.__gamestate.active_player
+        return self.__check_place(coords, player)[0]
+
+    def __check_place(self, coords: tuple[int, ...], player: Optional[int] = None
+                      ) -> tuple[bool, Optional[Callable[[], list[Board.Line]]]]:
+        """
+        Check if a move is legal, as for can_place
+        :returns: Whether or not the move is legal, and, if it is, a function to get the lines through the coordinates.
+        If the restrictions needed the lines, the function returns them without recomputing them.
+        """
+        board = self.__gamestate.board
+
+        # Wrong number of dimensions, or out of bounds
+        if not self.__is_on_board(coords):
+            return False, None
+
+        # Already a tile there
+        if board.data[coords] != EMPTY:
+            return False, None
+
+        # Use the same tuple for the same coordinates every time, so that the board finds its cached lines by identity
+        coords = self.__coords.setdefault(coords, coords)
+        # Restrictions only get the lines if they need them, and the board only computes them once
+        get_lines = partial(board.get_lines, coords)
+
+        if not self.__restrictions:
+            return True, get_lines
+
+        # Restrictions are checked for the given player without changing the active player
         if player is None:
             player = self.next_player
-        self.__gamestate.active_player = player
 
-        try:
-            # Wrong number of dimensions
-            if len(coords) != len(self.__gamestate.board.dimensions):
-                return False
+        if not self.__satisfies_restrictions(coords, get_lines, player):
+            return False, None
+        return True, get_lines
 
-            # Out of bounds
-            if not all(0 <= ordinate < dimension
-                       for ordinate, dimension in zip(coords, self.__gamestate.board.dimensions)):
+    def __satisfies_restrictions(self, coords: tuple[int, ...], get_lines: Callable[[], list[Board.Line]],
+                                 player: int) -> bool:
+        for restriction in self.__restrictions:
+            if not restriction.invoke(self.__gamestate, coords, get_lines, player):
                 return False
+        return True
 
-            # Already a tile there
-            if self.__gamestate.board[coords] != EMPTY:
-                return False
+    def can_place_mask(self, player: Optional[int] = None) -> np.ndarray:
+        """
+        Check which moves are legal, as for can_place, for every tile on the board at once
+        :param player: The color of the tile to consider placing
+        :returns: An array of bools the shape of the board, which is True where the player can place
+        """
+        board = self.__gamestate.board
+        # Only empty tiles need their restrictions checked
+        mask = board.data == EMPTY
+        if not self.__restrictions:
+            return mask
 
-            # Check restrictions
-            if not self.__restrictions:
-                return True
-            lines = self.__gamestate.board.get_lines(coords)
-            return all(restriction.invoke(self.__gamestate, coords, lines) for restriction in self.__restrictions)
-        finally:
-            self.__gamestate.active_player = saved_active_player
+        if player is None:
+            player = self.next_player
+        for coords in np.argwhere(mask).tolist():
+            coords = self.__coords.setdefault(tuple(coords), tuple(coords))
+            if not self.__satisfies_restrictions(coords, partial(board.get_lines, coords), player):
+                mask[coords] = False
+        return mask
 
-    def place(self, coords: tuple[int, ...], player: Optional[int] = None):
+    def place(self, coords: tuple[int, ...], player: Optional[int] = None) -> bool:
         """
         Take a turn by placing a tile on the board, applying rules, and checking victory
         :param coords: The coordinates at which to place
         :param player: The color of the tile to place; if None, use the next player in turn order
+        :returns: Whether the move was legal, and so was taken
         """
         if player is None:
             player = self.next_player
-        if not self.can_place(coords, player):
-            return
+        is_legal, get_lines = self.__check_place(coords, player)
+        if not is_legal:
+            return False
 
         self.__gamestate.active_player = player
 
@@ -97,18 +172,20 @@ class Game:
         self.__gamestate.board[coords] = player
 
         # Apply rules
-        lines = self.__gamestate.board.get_lines(coords)
+        # Lines are views of the board, so any lines found while checking restrictions already include the new tile
+        lines = get_lines()
         for rule in self.__rules:
             rule.invoke(self.__gamestate, coords, lines)
 
         # Check victory conditions
-        for score in self.__scores:
-            if score.win_threshold is not None:
-                for player in range(NUM_PLAYERS):
-                    if self.__gamestate.scores[score.name][player] >= score.win_threshold:
-                        self.winner = player
-                        self.win_reason = score.name
-                        break
-                else:
-                    continue
-                break
+        if self.__win_memos:
+            # Each row is a score and each column is a player
+            scores = self.__gamestate.scores.array[self.__win_rows]
+            has_won = scores >= self.__win_thresholds[:, np.newaxis]
+            if has_won.any():
+                # The first win found in row-major order takes priority, ie by score and then by player
+                score_index, player = np.unravel_index(np.argmax(has_won), has_won.shape)
+                self.winner = int(player)
+                self.win_reason = self.__win_memos[score_index]
+
+        return True
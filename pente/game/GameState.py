@@ -1,27 +1,81 @@
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, InitVar, field
+from typing import Self
+
+import numpy as np
 
 from pente.game.Board import Board
 
 
-@dataclass
+class ScoreTable:
+    """
+    The values of each score for each player. Values are held in a single array with a row for each score, and can be
+    accessed by the score's memo like a dictionary.
+    """
+    __slots__ = ("__rows", "array")
+
+    def __init__(self, memos: Iterable[str], num_players: int):
+        # Maps each memo to its row in the array
+        self.__rows = {memo: i for i, memo in enumerate(memos)}
+        # Values are 64-bit so that scores can grow as large as any game will need without overflowing
+        self.array = np.zeros((len(self.__rows), num_players), dtype=np.int64)
+
+    def row(self, memo: str) -> int:
+        """The index of the row of the array that holds the values of a given score"""
+        return self.__rows[memo]
+
+    def __getitem__(self, memo: str) -> np.ndarray:
+        """A view of the value of a given score for each player, which can be modified in place"""
+        return self.array[self.__rows[memo]]
+
+    def __contains__(self, memo: str) -> bool:
+        return memo in self.__rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__rows)
+
+    def __len__(self) -> int:
+        return len(self.__rows)
+
+    def copy(self) -> Self:
+        result = ScoreTable.__new__(ScoreTable)
+        # The rows never change, so can be shared between copies
+        result.__rows = self.__rows
+        result.array = self.array.copy()
+        return result
+
+    def to_dict(self) -> dict[str, list[int]]:
+        return dict(zip(self.__rows, self.array.tolist()))
+
+
+@dataclass(slots=True)
 class GameState:
     board: Board
     memos: InitVar[Iterable[str]]
     num_players: int
-    scores: dict[str, list[int]] = field(init=False, default=None)
+    scores: ScoreTable = field(init=False, default=None)
     active_player: int = field(init=False, default=-1)
 
     def __post_init__(self, memos: list[str]):
-        self.scores = {memo: [0] * self.num_players for memo in memos}
+        self.scores = ScoreTable(memos, self.num_players)
 
     @property
     def next_player(self):
         return (self.active_player + 1) % self.num_players
 
+    def copy(self) -> Self:
+        """
+        Copy the gamestate, so that the copy can be played on without affecting the original. Only the tiles and the
+        values of scores are copied; everything else is shared.
+        """
+        result = GameState(self.board.copy(), (), self.num_players)
+        result.scores = self.scores.copy()
+        result.active_player = self.active_player
+        return result
+
     def to_dict(self):
         result = {"board": self.board.to_list(),
                   "num_players": self.num_players,
-                  "scores": self.scores,
+                  "scores": self.scores.to_dict(),
                   "active_player": self.active_player}
         return result
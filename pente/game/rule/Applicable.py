@@ -1,17 +1,19 @@
 from abc import ABC, abstractmethod
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
 from enum import IntEnum
 
 from pente.game.Board import EMPTY
 from pente.game.GameState import GameState
 
 
-#########################################################################################################
-# GROUP A SKILL: COMPLEX USER-DEFINED USE OF OOP MODEL                                                  #
-# The abstract class Applicable defines the utility method _resolve_player_index used by its subclasses #
-#########################################################################################################
+####################################################################################################
+# GROUP A SKILL: COMPLEX USER-DEFINED USE OF OOP MODEL                                             #
+# The abstract class Applicable defines the utility method _player_resolver used by its subclasses #
+####################################################################################################
 class Applicable(ABC):
     """Anything that looks at a pattern match is applicable"""
+    # Applicables are built for every rule of every data pack, so they and their subclasses don't have a __dict__
+    __slots__ = ()
 
     class _PlayerIndexRogue(IntEnum):
         """The rogue values used for player_index keys in datapacks"""
@@ -20,28 +22,39 @@ class Applicable(ABC):
         REMOVE = -3
 
     @abstractmethod
-    def apply(self, gamestate: GameState, locations: Sequence[tuple[int, ...]], center: tuple[int, ...]) -> bool:
+    def apply(self, gamestate: GameState, locations: Sequence[tuple[int, ...]], center: tuple[int, ...],
+              active_player: int) -> bool:
+        """
+        :param gamestate: The gamestate in which the pattern matched
+        :param locations: The match locations
+        :param center: The location of the center in the board
+        :param active_player: The player whose move is being checked or made, who may not yet be the gamestate's active
+        player
+        """
         raise NotImplementedError
 
     @staticmethod
-    def _resolve_player_index(gamestate: GameState, locations: Sequence[tuple[int, ...]], center: tuple[int, ...],
-                              player_index: int) -> int:
+    def _player_resolver(player_index: int
+                         ) -> Callable[[GameState, Sequence[tuple[int, ...]], tuple[int, ...], int], int]:
         """
-        Resolve a player index specified within a rule, including the rogue values -1, -2, and -3
-        :param gamestate: The gamestate within which to resolve the index
-        :param locations: The match locations
-        :param center: The location of the center in the board (NOT an index into locations)
+        Get a function to resolve a player index specified within a rule, including the rogue values -1, -2, and -3.
+        The kind of index is only checked once, when the rule is built, rather than whenever the rule is applied.
         :param player_index: The index to resolve
-        :returns: The player at that index
+        :returns: A function of the gamestate within which to resolve the index, the match locations, the location of
+        the center in the board (NOT an index into locations), and the player whose move it is, which returns the player
+        at that index
         """
         if player_index == Applicable._PlayerIndexRogue.REMOVE:
-            return EMPTY
+            return lambda gamestate, locations, center, active_player: EMPTY
         elif player_index == Applicable._PlayerIndexRogue.ACTIVE:
-            return gamestate.active_player
+            return lambda gamestate, locations, center, active_player: active_player
         elif player_index == Applicable._PlayerIndexRogue.CENTER:
-            return gamestate.board[center]
-        else:
-            player = gamestate.board[locations[player_index]]
+            return lambda gamestate, locations, center, active_player: gamestate.board.data[center]
+
+        def resolve(gamestate: GameState, locations: Sequence[tuple[int, ...]], center: tuple[int, ...],
+                    active_player: int) -> int:
+            player = gamestate.board.data[locations[player_index]]
             if player == EMPTY:
                 raise RuntimeError("Player index referred to empty tile (likely caused by a broken datapack)")
             return player
+        return resolve
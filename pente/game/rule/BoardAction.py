@@ -5,12 +5,15 @@ from pente.game.GameState import GameState
 
 
 class BoardAction(Applicable):
+    __slots__ = ("__location_index", "__resolve_player")
+
     def __init__(self, location_index: int, player_index: int):
         self.__location_index = location_index
-        self.__player_index = player_index
+        self.__resolve_player = self._player_resolver(player_index)
 
-    def apply(self, gamestate: GameState, locations: Sequence[tuple[int, ...]], center: tuple[int, ...]) -> bool:
-        player = self._resolve_player_index(gamestate, locations, center, self.__player_index)
+    def apply(self, gamestate: GameState, locations: Sequence[tuple[int, ...]], center: tuple[int, ...],
+              active_player: int) -> bool:
+        player = self.__resolve_player(gamestate, locations, center, active_player)
         location = locations[self.__location_index]
         gamestate.board[location] = player
         return True
@@ -2,40 +2,54 @@ from collections.abc import Sequence, Collection
 from typing import Optional
 
 from pente.game.rule.Applicable import Applicable
-from pente.game.GameState import GameState
+from pente.game.GameState import GameState, ScoreTable
 
 
 class ScoreCondition(Applicable):
+    __slots__ = ("__resolve_player", "__memo", "__minimum", "__maximum", "__table", "__row")
+
     def __init__(self, player_index: int, memo: str, minimum: Optional[int] = None, maximum: Optional[int] = None):
-        self.__player_index = player_index
+        self.__resolve_player = self._player_resolver(player_index)
         self.__memo = memo
         self.__minimum = minimum
         self.__maximum = maximum
-
-    def apply(self, gamestate: GameState, locations: Sequence[tuple[int, ...]], center: tuple[int, ...]) -> bool:
-        scores = gamestate.scores[self.__memo]
-        player = self._resolve_player_index(gamestate, locations, center, self.__player_index)
-        if (self.__minimum is not None and scores[player] < self.__minimum or
-                self.__maximum is not None and scores[player] > self.__maximum):
+        # The score table this condition last checked, and the row of its array holding the score (see ScoreAction)
+        self.__table: Optional[ScoreTable] = None
+        self.__row = -1
+
+    def apply(self, gamestate: GameState, locations: Sequence[tuple[int, ...]], center: tuple[int, ...],
+              active_player: int) -> bool:
+        table = gamestate.scores
+        if table is not self.__table:
+            self.__table = table
+            self.__row = table.row(self.__memo)
+        player = self.__resolve_player(gamestate, locations, center, active_player)
+        score = table.array[self.__row, player]
+        if (self.__minimum is not None and score < self.__minimum or
+                self.__maximum is not None and score > self.__maximum):
             return False
         return True
 
 
 class CoordsCondition(Applicable):
+    __slots__ = ("__axes", "__minimum", "__maximum")
+
     def __init__(self, axes: Collection[int], minimum: Optional[int], maximum: Optional[int]):
-        self.__axes = axes
+        # Axes in ascending order, so that checking can stop at the first axis the board doesn't have
+        self.__axes = tuple(sorted(set(axes)))
         self.__minimum = minimum
         self.__maximum = maximum
 
-    def apply(self, gamestate: GameState, locations: Sequence[tuple[int, ...]], center: tuple[int, ...]) -> bool:
-        for axis, ordinate in enumerate(center):
-            if axis not in self.__axes:
-                continue
-            if (self.__minimum is not None and ordinate < self.__minimum or
-                    self.__maximum is not None and ordinate > self.__maximum):
+    def apply(self, gamestate: GameState, locations: Sequence[tuple[int, ...]], center: tuple[int, ...],
+              active_player: int) -> bool:
+        minimum, maximum = self.__minimum, self.__maximum
+        for axis in self.__axes:
+            if axis >= len(center):
+                break
+            ordinate = center[axis]
+            if minimum is not None and ordinate < minimum or maximum is not None and ordinate > maximum:
                 return False
-        else:
-            return True
+        return True
 
 
 #####################################################################################################################
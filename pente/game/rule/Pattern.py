@@ -3,7 +3,7 @@ from typing import Optional
 import re
 import string
 
-from pente.game.Board import Board, EMPTY
+from pente.game.Board import Board
 
 _pattern_validator = re.compile(r'''
     [#.0-9a-zA-Z-]*
@@ -15,6 +15,8 @@ _pattern_validator = re.compile(r'''
 
 
 class Pattern:
+    __slots__ = ("__center", "__string", "__care", "__value", "__letter_count", "__variable_positions", "__regex")
+
     def __init__(self, s: str):
         match = re.fullmatch(_pattern_validator, s)
         if match is None:
@@ -27,6 +29,40 @@ class Pattern:
 
         self.__string = s.replace("[", "").replace("]", "")
 
+        # Compile the pattern into masks over a packed line (see Board.Line.packed), so that whether each tile is a
+        # stone or empty can be checked for the whole match at once. The match starts at the lowest byte.
+        # care has a bit set for each bit of the packed tiles that is checked, and value holds the required bits
+        self.__care = 0
+        self.__value = 0
+        for i, char in enumerate(self.__string):
+            if char == "-":
+                # Empty tiles are exactly 0xFF
+                self.__care |= 0xFF << 8 * i
+                self.__value |= 0xFF << 8 * i
+            elif char == "#" or char in string.ascii_letters:
+                # Stones have the top bit clear
+                self.__care |= 0x80 << 8 * i
+        # Each letter (in lowercase) is numbered, so that variables can be recorded in lists rather than dictionaries
+        letters = {char.lower(): None for char in self.__string if char in string.ascii_letters}
+        self.__letter_count = len(letters)
+        slots = {letter: slot for slot, letter in enumerate(letters)}
+        # The position in the match, the number of the letter, and whether it's uppercase, for each variable
+        self.__variable_positions = tuple((i, slots[char.lower()], char.isupper())
+                                          for i, char in enumerate(self.__string) if char in string.ascii_letters)
+
+        # Without variables, the pattern is a regular expression over the bytes of a line (see Board.Line.tile_bytes),
+        # so every start can be tried in one search
+        if self.__variable_positions:
+            self.__regex = None
+        else:
+            self.__regex = re.compile(b"".join(
+                b"\xff" if char == "-" else b"[\x00-\x7f]" if char == "#" else b"." for char in self.__string
+            ), re.DOTALL)
+
+    def __len__(self) -> int:
+        """The number of tiles matched by this pattern"""
+        return len(self.__string)
+
     ####################################################################################################################
     # GROUP A SKILL: COMPLEX USER-DEFINED ALGORITHMS - PATTERN MATCHING                                                #
     # Pattern matching. Datapacks define patterns which affect whether and how rules are invoked. Patterns are matched #
@@ -38,63 +74,74 @@ class Pattern:
         :param line: The line to match
         :returns: The positions at which the line matched, as indices into the board, or None if it didn't
         """
+        length = len(self.__string)
         if self.__center is not None:
             # Skip the start of line to force the centers to line up
             start = line.center - self.__center
-            if self._full_match(line.tiles[start:start + len(self.__string)]):
-                return self._get_match_locations(line, start)
-            return None
+            starts = range(start, start + 1) if 0 <= start <= len(line.tiles) - length else range(0)
         else:
             # Try matching from every position that would include the line center
-            for start in range(max(0, line.center - len(self.__string) + 1),
-                               min(line.center + 1, len(line.tiles) - len(self.__string) + 1)):
-                match = self._full_match(line.tiles[start:start + len(self.__string)])
-                if match:
-                    return self._get_match_locations(line, start)
-            return None
-
-    def _full_match(self, tiles: Sequence[int]) -> bool:
+            starts = range(max(0, line.center - length + 1), min(line.center + 1, len(line.tiles) - length + 1))
+
+        if self.__regex is not None:
+            if not starts:
+                return None
+            # The search can't run past the end of a match from the last start
+            match = self.__regex.search(line.tile_bytes, starts.start, starts.stop - 1 + length)
+            return None if match is None else self._get_match_locations(line, match.start())
+
+        packed = line.packed
+        # The tiles as a list, for checking variables; only found once any start needs them
+        tiles = None
+        for start in starts:
+            # Check stones and empty tiles together, and only then check variables
+            if (packed >> 8 * start) & self.__care != self.__value:
+                continue
+            if self.__variable_positions:
+                if tiles is None:
+                    tiles = line.tiles.tolist()
+                if not self._match_variables(tiles, start):
+                    continue
+            return self._get_match_locations(line, start)
+        return None
+
+    def _match_variables(self, tiles: Sequence[int], start: int) -> bool:
         """
-        Get whether this pattern matches a given line exactly, ignoring centers
+        Get whether the variables in this pattern are consistent with a given line, which has stones wherever the
+        pattern has variables when matched from the given start
         :param tiles: The line to match
-        :returns: Whether or not this pattern matches the line exactly, ignoring centers
+        :param start: The index in the line at which the match starts
+        :returns: Whether or not the variables in this pattern are consistent with the line
         """
-        if len(self.__string) != len(tiles):
-            return False
-
-        # Each uppercase letter maps to the player it represents
-        variables: dict[str, int] = {}
+        # Each uppercase letter maps to the player it represents, or None if it hasn't been seen yet
+        variables: list[Optional[int]] = [None] * self.__letter_count
         # Each lowercase letter maps to the players that it has represented, and therefore can't be the uppercase letter
-        lower_representees: dict[str, set[int]] = {}
-        for char, tile in zip(self.__string, tiles):
-            if char == "#" and tile == EMPTY:
-                return False
-            elif char == "-" and tile != EMPTY:
-                return False
-            elif char in string.ascii_letters:
-                if tile == EMPTY:
-                    return False
-
+        lower_representees: list[Optional[set[int]]] = [None] * self.__letter_count
+        for i, slot, is_upper in self.__variable_positions:
+            tile = tiles[start + i]
+            variable = variables[slot]
+            if is_upper:
                 # Variables must represent the same player
-                if char in variables:
-                    if tile != variables[char]:
-                        return False
-                # Variables must not represent their inverse
-                elif char.isupper():
-                    if char.lower() in lower_representees and tile in lower_representees[char.lower()]:
+                if variable is not None:
+                    if tile != variable:
                         return False
-                    variables[char] = tile
                 # Variables must not represent their inverse
-                elif char.upper() in variables:
-                    if tile == variables[char.upper()]:
-                        return False
-                # Record lowercase representees
-                elif char in lower_representees:
-                    lower_representees[char].add(tile)
                 else:
-                    lower_representees[char] = {tile}
+                    representees = lower_representees[slot]
+                    if representees is not None and tile in representees:
+                        return False
+                    variables[slot] = tile
+            # Variables must not represent their inverse
+            elif variable is not None:
+                if tile == variable:
+                    return False
+            # Record lowercase representees
+            elif lower_representees[slot] is not None:
+                lower_representees[slot].add(tile)
+            else:
+                lower_representees[slot] = {tile}
 
         return True
 
     def _get_match_locations(self, line: Board.Line, start: int) -> Sequence[tuple[int, ...]]:
-        return line.tile_indices[start : start + len(self.__string)]
+        return line.segment_indices(start, len(self.__string))
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Collection, Sequence
+from collections.abc import Callable, Collection, Sequence
 from typing import Optional
 
 from pente.game.Board import Board
@@ -11,8 +11,12 @@ from pente.game.rule.Rule import Rule
 
 
 class DisjunctionRestriction:
+    __slots__ = ("__conjunctions",)
+
     def __init__(self, conjunctions: Collection[Collection[Restriction]]):
-        self.__conjunctions = conjunctions
+        # Restrictions have no side effects, so the order in which conjunctions are tried doesn't affect the result.
+        # Conjunctions that pass are moved towards the front, so the one that usually passes tends to be tried first.
+        self.__conjunctions = [tuple(conjunction) for conjunction in conjunctions]
 
     ############################################################################################################
     # GROUP A SKILL: RECURSIVE ALGORITHMS                                                                      #
@@ -20,22 +24,42 @@ class DisjunctionRestriction:
     # The truth value of a DisjunctionRestriction is therefore determined recursively                          #
     # The base case here is based on polymorphism - we recurse iff a child is a DisjunctionRestriction         #
     ############################################################################################################
-    def invoke(self, gamestate: GameState, center: tuple[int, ...], lines: Sequence[Board.Line]) -> bool:
-        return any(all(restriction.invoke(gamestate, center, lines) for restriction in conjunction)
-                   for conjunction in self.__conjunctions)
+    def invoke(self, gamestate: GameState, center: tuple[int, ...],
+               get_lines: Callable[[], Sequence[Board.Line]], active_player: int) -> bool:
+        conjunctions = self.__conjunctions
+        for i, conjunction in enumerate(conjunctions):
+            for restriction in conjunction:
+                if not restriction.invoke(gamestate, center, get_lines, active_player):
+                    break
+            else:
+                if i > 0:
+                    conjunctions[i - 1], conjunctions[i] = conjunction, conjunctions[i - 1]
+                return True
+        return False
 
 
 class PatternRestriction(Rule):
     """
     A version of Rule that cannot apply actions
     """
+    __slots__ = ("__negate",)
+
     def __init__(self, pattern: Pattern, conditions: Sequence[Condition], active_player: Optional[int] = None,
                  negate: bool = False):
         super().__init__(pattern, Rule.Mode.ONE, conditions, [], [], active_player)
         self.__negate = negate
 
-    def invoke(self, gamestate: GameState, center: tuple[int, ...], lines: Sequence[Board.Line]) -> bool:
-        result = self.__negate != super().invoke(gamestate, center, lines)
+    def invoke(self, gamestate: GameState, center: tuple[int, ...],
+               get_lines: Callable[[], Sequence[Board.Line]], active_player: int) -> bool:
+        """
+        Check the restriction for a given centre
+        :param get_lines: Gets the lines through the centre; only called if the pattern needs to be matched
+        :param active_player: The player whose move is being checked; the gamestate's active player isn't changed
+        """
+        # A rule that can't apply for the active player never matches, so there's no need to get the lines
+        if not self._is_active(active_player):
+            return self.__negate
+        result = self.__negate != self._invoke_for(gamestate, center, get_lines(), active_player)
         return result
 
 
@@ -1,4 +1,4 @@
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
 from enum import auto, Enum
 import itertools
 from typing import Optional
@@ -12,6 +12,8 @@ from pente.game.rule.ScoreAction import ScoreAction
 
 
 class Rule:
+    __slots__ = ("__pattern", "__multimatchmode", "__active_player", "__actions", "__satisfies_conditions")
+
     class Mode(Enum):
         ONE = auto()
         HALF = auto()
@@ -22,33 +24,74 @@ class Rule:
                  active_player: Optional[int] = None):
         self.__pattern = pattern
         self.__multimatchmode = multimatch_mode
-        self.__conditions = conditions
-        self.__score_actions = score_actions
-        self.__board_actions = board_actions
         self.__active_player = active_player
+        # Score actions are applied before board actions
+        self.__actions = tuple(itertools.chain(score_actions, board_actions))
+        self.__satisfies_conditions = Rule.__conditions_checker(conditions)
+
+    @staticmethod
+    def __conditions_checker(conditions: Sequence[Condition]
+                             ) -> Callable[[GameState, Sequence[tuple[int, ...]], tuple[int, ...], int], bool]:
+        """
+        Get a function to check whether a match satisfies all of the given conditions. Rules rarely have more than a
+        couple of conditions, so those cases are checked without a generator.
+        :returns: A function of the gamestate, the match locations, the center, and the active player
+        """
+        if not conditions:
+            return lambda gamestate, locations, center, active_player: True
+        elif len(conditions) == 1:
+            return conditions[0].apply
+        elif len(conditions) == 2:
+            first, second = conditions
+            return lambda gamestate, locations, center, active_player: (
+                first.apply(gamestate, locations, center, active_player)
+                and second.apply(gamestate, locations, center, active_player)
+            )
+        conditions = tuple(conditions)
+        return lambda gamestate, locations, center, active_player: all(
+            condition.apply(gamestate, locations, center, active_player) for condition in conditions
+        )
+
+    def _is_active(self, active_player: int) -> bool:
+        """Whether or not the rule can apply for a given active player"""
+        return self.__active_player is None or active_player == self.__active_player
 
     def invoke(self, gamestate: GameState, center: tuple[int, ...], lines: Sequence[Board.Line]) -> bool:
         """Apply the rule everywhere where it is applicable, for a given centre"""
-        if self.__active_player is not None and gamestate.active_player != self.__active_player:
+        return self._invoke_for(gamestate, center, lines, gamestate.active_player)
+
+    def _invoke_for(self, gamestate: GameState, center: tuple[int, ...], lines: Sequence[Board.Line],
+                    active_player: int) -> bool:
+        """
+        Apply the rule everywhere where it is applicable, for a given centre, as though a given player were active
+        """
+        if not self._is_active(active_player):
             return False
 
+        match_line = self.__pattern.match_line
+        satisfies_conditions = self.__satisfies_conditions
+        is_half = self.__multimatchmode is Rule.Mode.HALF
+        is_one = self.__multimatchmode is Rule.Mode.ONE
+
         matched_directions = set()
         matches = []
         for i, line in enumerate(lines):
-            if self.__multimatchmode == Rule.Mode.HALF and len(lines) - i - 1 in matched_directions:
+            if is_half and len(lines) - i - 1 in matched_directions:
                 continue
 
-            match = self.__pattern.match_line(line)
+            match = match_line(line)
             if match is not None:
-                does_satisfy = all(condition.apply(gamestate, match, center) for condition in self.__conditions)
-                if does_satisfy:
+                if satisfies_conditions(gamestate, match, center, active_player):
                     matched_directions.add(i)
                     matches.append(match)
-                    if self.__multimatchmode == Rule.Mode.ONE:
+                    if is_one:
                         break
 
-        for action in itertools.chain(self.__score_actions, self.__board_actions):
+        if not matches:
+            return False
+
+        for action in self.__actions:
             for match in matches:
-                action.apply(gamestate, match, center)
+                action.apply(gamestate, match, center, active_player)
 
-        return len(matches) > 0
+        return True
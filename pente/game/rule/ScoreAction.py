@@ -2,9 +2,10 @@ import operator
 from collections.abc import Sequence
 from enum import Enum
 from functools import partial
+from typing import Optional
 
 from pente.game.rule.Applicable import Applicable
-from pente.game.GameState import GameState
+from pente.game.GameState import GameState, ScoreTable
 
 
 class ScoreAction(Applicable):
@@ -18,14 +19,26 @@ class ScoreAction(Applicable):
         def __call__(self, *args, **kwargs):
             return self.value(*args, **kwargs)
 
+    __slots__ = ("__resolve_player", "__memo", "__table", "__row", "__operate", "__value")
+
     def __init__(self, player_index: int, memo: str, operation: Operation, value: int):
-        self.__player_index = player_index
+        self.__resolve_player = self._player_resolver(player_index)
         self.__memo = memo
-        self.__operation = operation
+        # The score table this action last applied to, and the row of its array holding the score. Tables differ
+        # between gamestates, so the row is only looked up again when the table changes.
+        self.__table: Optional[ScoreTable] = None
+        self.__row = -1
+        # The function wrapped by the operation is called directly, rather than through the enum and the partial
+        self.__operate = operation.value.func
         self.__value = value
 
-    def apply(self, gamestate: GameState, locations: Sequence[tuple[int, ...]], center: tuple[int, ...]) -> bool:
-        player = self._resolve_player_index(gamestate, locations, center, self.__player_index)
-        previous = gamestate.scores[self.__memo][player]
-        gamestate.scores[self.__memo][player] = self.__operation(previous, self.__value)
+    def apply(self, gamestate: GameState, locations: Sequence[tuple[int, ...]], center: tuple[int, ...],
+              active_player: int) -> bool:
+        player = self.__resolve_player(gamestate, locations, center, active_player)
+        table = gamestate.scores
+        if table is not self.__table:
+            self.__table = table
+            self.__row = table.row(self.__memo)
+        index = (self.__row, player)
+        table.array[index] = self.__operate(table.array[index], self.__value)
         return True
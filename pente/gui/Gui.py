@@ -1,8 +1,12 @@
 import os
 import sys
 import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import partial
 from tkinter import ttk
+from typing import Optional
+
+import numpy as np
 
 from pente.account import accounts, stats
 from pente.core.Core import Core
@@ -18,6 +22,13 @@ elif sys.platform == 'darwin':
 else:
     _BOARD_FONT_SIZE = 14
 
+# The styles of buttons which are toggled on or highlighted, and of those which aren't
+_HIGHLIGHT_STYLE = 'highlight.TButton'
+_NORMAL_STYLE = 'TButton'
+
+# How often to check whether the AI has finished finding a suggestion, in milliseconds
+_AI_POLL_INTERVAL = 30
+
 
 ###############################################################################
 # GROUP A SKILL: COMPLEX USER-DEFINED USE OF OOP MODEL                        #
@@ -27,15 +38,29 @@ class Gui(tk.Frame, PlayerOutput):
     def __init__(self):
         self.__language = Language(["en_UK"], partial(print, end=""))
         self.__core = Core(self.__language)
-        self.__game_buttons: list[list[ttk.Button]] = [[] for _ in range(19)]
-        self.__game_labels = set()
+        # The widgets showing each tile of the board, which are kept between moves and games rather than recreated
+        self.__game_buttons: list[list[ttk.Button]] = []
+        self.__board_labels: list[list[ttk.Label]] = []
+        # The labels of the game by their (row, column) in the grid. Labels are kept when hidden, to be shown again.
+        self.__game_labels: dict[tuple[int, int], ttk.Label] = {}
+        # The text of each label of the game that is currently shown, by its (row, column)
+        self.__shown_label_texts: dict[tuple[int, int], str] = {}
+        # The tiles shown on the game buttons, so that updates only change the buttons whose tiles have changed, or None
+        # if the buttons are hidden
+        self.__drawn_tiles: Optional[np.ndarray] = None
+        # The tiles shown by the text of the board labels, which is kept while they're hidden, or None if they're new
+        self.__labelled_tiles: Optional[np.ndarray] = None
+        # The button highlighted by an AI suggestion
+        self.__highlighted_button: Optional[ttk.Button] = None
+        # The AI runs away from the Tk thread, so that the GUI still responds while it's thinking
+        self.__ai_executor = ThreadPoolExecutor(max_workers=1)
 
         super().__init__(tk.Tk())
         self.grid()
         self.winfo_toplevel().title(self.__language.resolve_key("gui.name"))
         # Used to highlight buttons by turning the text green
         style = ttk.Style(self)
-        style.configure('highlight.TButton', foreground='#00D040')
+        style.configure(_HIGHLIGHT_STYLE, foreground='#00D040')
 
         y = 0
         ttk.Button(self, text=self.__language.resolve_key("gui.button.help"), command=self.__help).grid(row=y, column=0)
@@ -99,7 +124,7 @@ class Gui(tk.Frame, PlayerOutput):
         ).grid(row=y, column=2)
 
         y += 1
-        available_packs = os.listdir("resources/datapack")
+        available_packs = set(os.listdir("resources/datapack"))
         for i, name in enumerate(("pro", "keryo", "pente")):
             if f"{name}.json" in available_packs:
                 ttk.Button(self, text=name, command=partial(self.__load_data, name)).grid(row=y, column=i)
@@ -109,7 +134,7 @@ class Gui(tk.Frame, PlayerOutput):
             self,
             text=self.__language.resolve_key("gui.button.autosave"),
             command=self.__toggle_autosave,
-            style='highlight.TButton'
+            style=_HIGHLIGHT_STYLE
         )
         self.__toggle_autosave_button.grid(row=y, column=0)
         ttk.Button(
@@ -153,16 +178,17 @@ class Gui(tk.Frame, PlayerOutput):
         if username is None:
             return
 
-        self.__language.print_key("gui.show_stats.header")
-        for win_reason, wins in stats.get_all_wins(username).items():
-            self.__language.print_key("gui.show_stats.stat", reason=win_reason, wins=str(wins))
+        self.__language.print_keys([
+            ("gui.show_stats.header", {}),
+            *(("gui.show_stats.stat", {"reason": win_reason, "wins": str(wins)})
+              for win_reason, wins in stats.get_all_wins(username).items())
+        ])
 
     def __toggle_track_stats(self):
         self.__core.should_track_stats = not self.__core.should_track_stats
-        if self.__core.should_track_stats:
-            self.__toggle_track_stats_button.config(style='highlight.TButton')
-        else:
-            self.__toggle_track_stats_button.config(style='TButton')
+        self.__toggle_track_stats_button.config(
+            style=_HIGHLIGHT_STYLE if self.__core.should_track_stats else _NORMAL_STYLE
+        )
 
     def __set_difficulty(self):
         try:
@@ -173,10 +199,33 @@ class Gui(tk.Frame, PlayerOutput):
         self.__core.difficulty = difficulty
 
     def __ai_suggestion(self):
-        coords = self.__core.ai_suggestion()
-        if coords is None:
+        task = self.__core.ai_suggestion_task()
+        if task is None:
+            return
+        future = self.__ai_executor.submit(task)
+        self.after(_AI_POLL_INTERVAL, self.__poll_ai_suggestion, future, self.__drawn_tiles)
+
+    def __poll_ai_suggestion(self, future: Future, drawn_tiles: Optional[np.ndarray]):
+        """
+        Highlight the AI's suggestion once it's found, checking again later if it hasn't been found yet. All Tk calls
+        are made from the Tk thread.
+        :param future: The AI's suggestion
+        :param drawn_tiles: The tiles shown when the suggestion was asked for
+        """
+        if not future.done():
+            self.after(_AI_POLL_INTERVAL, self.__poll_ai_suggestion, future, drawn_tiles)
+            return
+
+        coords = future.result()
+        # If the board has been redrawn since, a move was made while the AI was thinking and the suggestion is stale
+        if coords is None or self.__drawn_tiles is not drawn_tiles:
             return
-        self.__game_buttons[coords[0]][coords[1]].config(style='highlight.TButton')
+        button = self.__game_buttons[coords[0]][coords[1]]
+        if button is self.__highlighted_button:
+            return
+        self.__clear_highlight()
+        self.__highlighted_button = button
+        button.config(style=_HIGHLIGHT_STYLE)
 
     def __save_game(self):
         self.__core.save(self.__filename_entry.get() or None)
@@ -186,10 +235,7 @@ class Gui(tk.Frame, PlayerOutput):
 
     def __toggle_autosave(self):
         self.__core.should_autosave = not self.__core.should_autosave
-        if self.__core.should_autosave:
-            self.__toggle_autosave_button.config(style='highlight.TButton')
-        else:
-            self.__toggle_autosave_button.config(style='TButton')
+        self.__toggle_autosave_button.config(style=_HIGHLIGHT_STYLE if self.__core.should_autosave else _NORMAL_STYLE)
 
     def __update_account_buttons(self):
         logged_in_accounts = self.__core.accounts
@@ -200,43 +246,134 @@ class Gui(tk.Frame, PlayerOutput):
                 button.config(text=self.__language.resolve_key("gui.button.empty_account"))
 
     def __clear_game(self):
+        """Hide the board and remove the labels of the game. The board's widgets are kept to be shown again."""
+        for row in self.__game_buttons + self.__board_labels:
+            for widget in row:
+                widget.grid_remove()
+        self.__drawn_tiles = None
+        self.__clear_highlight()
+        self.__clear_labels()
+
+    def __clear_labels(self):
+        self.__set_labels({})
+
+    def __set_labels(self, texts: dict[tuple[int, int], str]):
+        """
+        Show exactly the given labels of the game, hiding any others. Only labels that are newly shown or whose text
+        has changed are reconfigured.
+        :param texts: The text of each label to show, by its (row, column) in the grid
+        """
+        for cell in self.__shown_label_texts.keys() - texts.keys():
+            self.__game_labels[cell].grid_remove()
+
+        for cell, text in texts.items():
+            shown_text = self.__shown_label_texts.get(cell)
+            if shown_text == text:
+                continue
+            label = self.__game_labels.get(cell)
+            if label is None:
+                label = self.__game_labels[cell] = ttk.Label(self)
+            label.config(text=text)
+            if shown_text is None:
+                label.grid(row=cell[0], column=cell[1])
+
+        self.__shown_label_texts = texts
+
+    def __clear_highlight(self):
+        if self.__highlighted_button is not None:
+            self.__highlighted_button.config(style=_NORMAL_STYLE)
+            self.__highlighted_button = None
+
+    @staticmethod
+    def __fits(widgets: list[list[ttk.Widget]], board: Board) -> bool:
+        """Whether or not a grid of widgets has one widget for each tile of a board"""
+        return bool(widgets) and (len(widgets), len(widgets[0])) == board.dimensions
+
+    def __show_buttons(self, board: Board):
+        """
+        Show a board as a grid of buttons to place on. The buttons are only created when the shape of the board changes,
+        and only the buttons whose tiles have changed since they were last shown are updated.
+        """
+        if not Gui.__fits(self.__game_buttons, board):
+            for row in self.__game_buttons:
+                for button in row:
+                    button.destroy()
+            height, width = board.dimensions
+            # Each button's command is set once, when it's created, since the buttons are kept between moves
+            self.__game_buttons = [[ttk.Button(self, width=1, command=partial(self.__core.ui_move, (y, x)))
+                                    for x in range(width)] for y in range(height)]
+            self.__drawn_tiles = None
+
+        self.__clear_highlight()
+        if self.__drawn_tiles is None:
+            # The buttons are hidden, possibly in favour of labels, so every button needs showing
+            for row in self.__board_labels:
+                for label in row:
+                    label.grid_remove()
+            for y, (buttons, tiles) in enumerate(zip(self.__game_buttons, board.to_list())):
+                for x, (button, tile) in enumerate(zip(buttons, tiles)):
+                    button.config(text="-" if tile == EMPTY else str(tile))
+                    button.grid(row=y, column=3+x)
+        else:
+            width = board.dimensions[1]
+            flat_tiles = board.data.ravel()
+            for index in np.flatnonzero(flat_tiles != self.__drawn_tiles.ravel()).tolist():
+                y, x = divmod(index, width)
+                tile = int(flat_tiles[index])
+                self.__game_buttons[y][x].config(text="-" if tile == EMPTY else str(tile))
+        self.__drawn_tiles = board.data.copy()
+
+    def __show_labels(self, board: Board):
+        """Show a board as a grid of labels, which can't be placed on, in place of the buttons"""
         for row in self.__game_buttons:
             for button in row:
-                button.destroy()
-        for label in self.__game_labels:
-            label.destroy()
-        self.__game_buttons = [[] for _ in range(19)]
-        self.__game_labels.clear()
-
-    def __draw_board(self, board: Board, buttons: bool):
-        for (y, x), tile in board.enumerate():
-            tile = "-" if tile == EMPTY else str(tile)
-
-            if buttons:
-                widget = ttk.Button(self, text=tile, command=partial(self.__core.ui_move, (y, x)), width=1)
-                self.__game_buttons[y].append(widget)
-            else:
-                widget = ttk.Label(self, text=tile, font=('Courier New', 20))
-                self.__game_labels.add(widget)
-            widget.grid(row=y, column=3+x)
+                button.grid_remove()
+        self.__drawn_tiles = None
+        self.__clear_highlight()
+
+        if not Gui.__fits(self.__board_labels, board):
+            for row in self.__board_labels:
+                for label in row:
+                    label.destroy()
+            height, width = board.dimensions
+            self.__board_labels = [[ttk.Label(self, font=('Courier New', 20)) for _ in range(width)]
+                                   for _ in range(height)]
+            self.__labelled_tiles = None
+
+        # Only the labels whose tiles differ from the last board they showed need their text changing
+        if self.__labelled_tiles is None:
+            changed = np.ones(board.data.shape, dtype=bool).tolist()
+        else:
+            changed = (board.data != self.__labelled_tiles).tolist()
+        for y, (labels, tiles, changed_row) in enumerate(zip(self.__board_labels, board.to_list(), changed)):
+            for x, (label, tile, is_changed) in enumerate(zip(labels, tiles, changed_row)):
+                if is_changed:
+                    label.config(text="-" if tile == EMPTY else str(tile))
+                label.grid(row=y, column=3+x)
+        self.__labelled_tiles = board.data.copy()
+
+    def __flush_redraw(self):
+        """
+        Redraw every widget changed by an update in one pass. Tk defers redrawing and geometry management to idle time,
+        so all of an update's changes are made first, and are then drawn together before any further work (such as an
+        autosave or AI suggestion) can delay them. Nothing else in the GUI forces a redraw.
+        """
+        self.update_idletasks()
 
     def send_update(self, game: Game, your_index: int, is_hotseat: bool):
-        self.__clear_game()
-        self.__draw_board(game.gamestate.board, True)
-
-        displayable_scores = game.get_displayable_scores()
-        for y, (display_name, values) in enumerate(displayable_scores):
-            label = ttk.Label(self, text=display_name)
-            label.grid(row=8+y, column=0)
-            self.__game_labels.add(label)
+        self.__show_buttons(game.gamestate.board)
+
+        texts = {}
+        for y, (display_name, values) in enumerate(game.get_displayable_scores()):
+            texts[(8+y, 0)] = display_name
             for x, value in enumerate(values):
-                label = ttk.Label(self, text=value)
-                label.grid(row=8+y, column=1+x)
-                self.__game_labels.add(label)
+                texts[(8+y, 1+x)] = str(value)
+        self.__set_labels(texts)
+
+        self.__flush_redraw()
 
     def send_victory(self, game: Game, your_index: int, is_hotseat: bool):
-        self.__clear_game()
-        self.__draw_board(game.gamestate.board, False)
-        label = ttk.Label(self, text=self.__language.resolve_key("gui.victory", player=str(game.winner)))
-        label.grid(row=8, column=0)
-        self.__game_labels.add(label)
+        self.__show_labels(game.gamestate.board)
+        self.__set_labels({(8, 0): self.__language.resolve_key("gui.victory", player=str(game.winner))})
+
+        self.__flush_redraw()